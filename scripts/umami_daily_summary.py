@@ -11,11 +11,28 @@ import sys
 import urllib.error
 import urllib.parse
 import urllib.request
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields, is_dataclass
 from datetime import date, datetime, time, timedelta, timezone
 from typing import Any
 from zoneinfo import ZoneInfo
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; fall back to stdlib json.
+    orjson = None
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:  # Optional; enables keep-alive connection reuse.
+    requests = None
+
+try:
+    import simdjson
+except ImportError:  # Optional speedup for sparse reads of large payloads.
+    simdjson = None
+
 
 DEFAULT_BASE_URL = "https://api.umami.is/v1"
 DEFAULT_FUNNEL_NAMES = "pv -> login,pv -> purchase,guest trial,pricing"
@@ -30,13 +47,54 @@ DEFAULT_FUNNEL_DISPLAY_NAMES = {
     "guest trial": "试用率",
     "pricing": "价格查看率",
 }
+MAX_FUNNEL_WORKERS = 8
 ENV_KEY_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+NON_WORD_PATTERN = re.compile(r"[\W_]+", re.UNICODE)
+_strip_non_word = NON_WORD_PATTERN.sub
+_UTC = timezone.utc
 
 
 class UmamiApiError(RuntimeError):
     """Raised when Umami API request fails."""
 
 
+def json_default(value: Any) -> Any:
+    # orjson serializes dataclasses natively; this covers the stdlib json fallback.
+    if is_dataclass(value) and not isinstance(value, type):
+        return {field.name: getattr(value, field.name) for field in fields(value)}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dump_json(value: Any, indent: bool = False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(value, default=json_default, option=option)
+    return json.dumps(
+        value, ensure_ascii=False, indent=2 if indent else None, default=json_default
+    ).encode("utf-8")
+
+
+def load_json(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+JSON_OBJECT_TYPES: tuple[type, ...] = (dict,) if simdjson is None else (dict, simdjson.Object)
+JSON_ARRAY_TYPES: tuple[type, ...] = (list,) if simdjson is None else (list, simdjson.Array)
+
+
+def materialize_json(value: Any) -> Any:
+    if simdjson is not None:
+        if isinstance(value, simdjson.Object):
+            return value.as_dict()
+        if isinstance(value, simdjson.Array):
+            return value.as_list()
+    return value
+
+
 @dataclass
 class RangeInfo:
     day: date
@@ -55,13 +113,47 @@ class RangeInfo:
         return int(self.utc_end.timestamp() * 1000)
 
 
+@dataclass
+class FunnelStep:
+    # Explicit __slots__ (dataclass(slots=True) needs Python 3.10+).
+    __slots__ = (
+        "step_index",
+        "step_type",
+        "step_value",
+        "step_label",
+        "visitors",
+        "dropoff",
+        "rate_from_previous",
+    )
+
+    step_index: int
+    step_type: Any
+    step_value: Any
+    step_label: str
+    visitors: int
+    dropoff: int
+    rate_from_previous: float | None
+
+
+@dataclass
+class ReportIndex:
+    exact: dict[str, dict[str, Any]]
+    normalized: dict[str, list[dict[str, Any]]]
+
+
 class UmamiClient:
-    """Minimal Umami API client using urllib from stdlib."""
+    """Minimal Umami API client using a pooled requests.Session, or urllib from stdlib."""
 
     def __init__(self, base_url: str, timeout: float = 30.0):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.headers = self._build_auth_headers()
+        # Shared read-only across requests (and funnel threads); never mutate per call.
+        self.json_headers = {**self.headers, "Content-Type": "application/json"}
+        self.session = self._build_session() if requests is not None else None
+        # Reused across lazy parses; not thread-safe, and each parsed document
+        # must be released before the next lazy request.
+        self.lazy_parser = simdjson.Parser() if simdjson is not None else None
 
     @staticmethod
     def _build_auth_headers() -> dict[str, str]:
@@ -85,29 +177,76 @@ class UmamiClient:
             "Missing auth. Set UMAMI_API_KEY (cloud) or UMAMI_BEARER_TOKEN (self-hosted)."
         )
 
+    def _build_session(self) -> Any:
+        # One pool shared by all calls (including the concurrent funnel runs),
+        # so the TCP/TLS handshake is paid once per connection, not per request.
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=MAX_FUNNEL_WORKERS, pool_maxsize=MAX_FUNNEL_WORKERS)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        # Auth headers are passed per call by request(), which picks headers or json_headers.
+        return session
+
     def request(
         self,
         method: str,
         path: str,
         query: dict[str, Any] | None = None,
         body: dict[str, Any] | None = None,
+        lazy: bool = False,
     ) -> Any:
         url = f"{self.base_url}/{path.lstrip('/')}"
         if query:
             encoded_query = urllib.parse.urlencode(query, doseq=True)
             url = f"{url}?{encoded_query}"
 
-        headers = dict(self.headers)
+        headers = self.headers
         payload = None
         if body is not None:
-            headers["Content-Type"] = "application/json"
-            payload = json.dumps(body).encode("utf-8")
+            headers = self.json_headers
+            payload = dump_json(body)
+
+        if self.session is not None:
+            raw = self._send_with_session(method, url, headers, payload)
+        else:
+            raw = self._send_with_urllib(method, url, headers, payload)
+
+        if not raw:
+            return None
 
+        try:
+            if lazy and self.lazy_parser is not None:
+                return self.lazy_parser.parse(raw)
+            return load_json(raw)
+        except ValueError as exc:
+            snippet = raw[:500].decode("utf-8", errors="replace")
+            raise UmamiApiError(f"Non-JSON response from {method} {url}: {snippet}") from exc
+
+    def _send_with_session(
+        self, method: str, url: str, headers: dict[str, str], payload: bytes | None
+    ) -> bytes:
+        try:
+            resp = self.session.request(
+                method, url, data=payload, headers=headers, timeout=self.timeout
+            )
+            resp.raise_for_status()
+        except requests.HTTPError as exc:
+            err_body = exc.response.content.decode("utf-8", errors="replace")
+            raise UmamiApiError(
+                f"HTTP {exc.response.status_code} when calling {method} {url}: {err_body}"
+            ) from exc
+        except requests.RequestException as exc:
+            raise UmamiApiError(f"Failed to call {method} {url}: {exc}") from exc
+        return resp.content
+
+    def _send_with_urllib(
+        self, method: str, url: str, headers: dict[str, str], payload: bytes | None
+    ) -> bytes:
         req = urllib.request.Request(url=url, data=payload, method=method, headers=headers)
 
         try:
             with urllib.request.urlopen(req, timeout=self.timeout) as resp:
-                raw = resp.read().decode("utf-8")
+                return resp.read()
         except urllib.error.HTTPError as exc:
             err_body = exc.read().decode("utf-8", errors="replace")
             raise UmamiApiError(
@@ -116,14 +255,6 @@ class UmamiClient:
         except urllib.error.URLError as exc:
             raise UmamiApiError(f"Failed to call {method} {url}: {exc}") from exc
 
-        if not raw:
-            return None
-
-        try:
-            return json.loads(raw)
-        except json.JSONDecodeError as exc:
-            raise UmamiApiError(f"Non-JSON response from {method} {url}: {raw[:500]}") from exc
-
     def get_basic_stats(self, website_id: str, range_info: RangeInfo) -> dict[str, Any]:
         return self.request(
             "GET",
@@ -185,37 +316,51 @@ class UmamiClient:
         page_size = 100
 
         while True:
-            resp = self.request(
-                "GET",
-                "reports",
-                query={
-                    "websiteId": website_id,
-                    "type": "funnel",
-                    "page": page,
-                    "pageSize": page_size,
-                },
-            )
-            if not isinstance(resp, dict):
+            fetched = self._get_funnel_report_page(website_id, page, page_size)
+            if fetched is None:
                 break
 
-            data = resp.get("data") or []
-            if not isinstance(data, list) or not data:
-                break
-
-            reports.extend([item for item in data if isinstance(item, dict)])
+            page_reports, data_len, total_count, current_page_size = fetched
+            reports.extend(page_reports)
 
-            total_count = resp.get("count")
-            current_page_size = resp.get("pageSize") or page_size
             if isinstance(total_count, int):
-                if page * int(current_page_size) >= total_count:
+                if page * int(current_page_size or page_size) >= total_count:
                     break
-            elif len(data) < page_size:
+            elif data_len < page_size:
                 break
 
             page += 1
 
         return reports
 
+    def _get_funnel_report_page(
+        self, website_id: str, page: int, page_size: int
+    ) -> tuple[list[dict[str, Any]], int, Any, Any] | None:
+        # Parsed lazily: only the fields copied out below are materialized, and
+        # nothing from the parsed document outlives this call.
+        resp = self.request(
+            "GET",
+            "reports",
+            query={
+                "websiteId": website_id,
+                "type": "funnel",
+                "page": page,
+                "pageSize": page_size,
+            },
+            lazy=True,
+        )
+        if not isinstance(resp, JSON_OBJECT_TYPES):
+            return None
+
+        data = resp.get("data") or []
+        if not isinstance(data, JSON_ARRAY_TYPES) or not data:
+            return None
+
+        page_reports = [
+            copy_funnel_report(item) for item in data if isinstance(item, JSON_OBJECT_TYPES)
+        ]
+        return page_reports, len(data), resp.get("count"), resp.get("pageSize")
+
     def run_funnel(
         self,
         website_id: str,
@@ -242,7 +387,23 @@ class UmamiClient:
 
 
 def to_iso(ts: datetime) -> str:
-    return ts.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    # parse_target_day tags its UTC boundaries with _UTC, so skip the conversion.
+    if ts.tzinfo is not _UTC:
+        ts = ts.astimezone(_UTC)
+    return ts.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def copy_funnel_report(item: Any) -> dict[str, Any]:
+    # Keep only the fields run_funnels reads.
+    report = {key: materialize_json(item[key]) for key in ("name", "reportId") if key in item}
+    parameters = item.get("parameters")
+    if isinstance(parameters, JSON_OBJECT_TYPES):
+        report["parameters"] = {
+            key: materialize_json(parameters[key])
+            for key in ("steps", "window")
+            if key in parameters
+        }
+    return report
 
 
 def extract_website_rows(payload: Any) -> list[dict[str, Any]]:
@@ -359,8 +520,9 @@ def parse_target_day(day_str: str | None, tz_name: str) -> RangeInfo:
 
     local_start = datetime.combine(day, time(0, 0, 0, 0), tzinfo=tz)
     local_end = datetime.combine(day, time(23, 59, 59, 999000), tzinfo=tz)
-    utc_start = local_start.astimezone(timezone.utc)
-    utc_end = local_end.astimezone(timezone.utc)
+    # Shift by each boundary's own offset so DST transition days keep their real length.
+    utc_start = (local_start - local_start.utcoffset()).replace(tzinfo=_UTC)
+    utc_end = (local_end - local_end.utcoffset()).replace(tzinfo=_UTC)
 
     return RangeInfo(
         day=day,
@@ -393,45 +555,52 @@ def parse_report_map(raw_map: str | None) -> dict[str, str]:
     return cleaned
 
 
-def metric_value(stats: dict[str, Any], key: str) -> float:
-    raw = stats.get(key)
-    if isinstance(raw, (int, float)):
-        return float(raw)
-    if isinstance(raw, dict):
-        nested = raw.get("value")
-        if isinstance(nested, (int, float)):
-            return float(nested)
-    return 0.0
+def metric_values(stats: dict[str, Any], *keys: str) -> list[float]:
+    values: list[float] = []
+    for key in keys:
+        raw = stats.get(key)
+        # Some Umami versions wrap each metric as {"value": ..., "prev": ...}.
+        if isinstance(raw, dict):
+            raw = raw.get("value")
+        values.append(float(raw) if isinstance(raw, (int, float)) else 0.0)
+    return values
 
 
 def normalize_name(name: str) -> str:
     # Keep alphanumerics (and CJK letters), remove spaces/punctuation for fuzzy matching.
-    return re.sub(r"[\W_]+", "", name.casefold(), flags=re.UNICODE)
+    return _strip_non_word("", name.casefold())
 
 
-def pick_report(target_name: str, reports: list[dict[str, Any]]) -> dict[str, Any] | None:
-    target_exact = target_name.casefold()
+def index_reports(reports: list[dict[str, Any]]) -> ReportIndex:
+    index = ReportIndex(exact={}, normalized={})
     for report in reports:
         report_name = str(report.get("name", ""))
-        if report_name.casefold() == target_exact:
-            return report
+        # First report wins on duplicate names, matching a linear scan.
+        index.exact.setdefault(report_name.casefold(), report)
+        report_norm = normalize_name(report_name)
+        if report_norm:
+            index.normalized.setdefault(report_norm, []).append(report)
+    return index
+
+
+def pick_report(target_name: str, index: ReportIndex) -> dict[str, Any] | None:
+    report = index.exact.get(target_name.casefold())
+    if report is not None:
+        return report
 
     target_norm = normalize_name(target_name)
     if not target_norm:
         return None
 
-    fuzzy_matches: list[dict[str, Any]] = []
-    for report in reports:
-        report_name = str(report.get("name", ""))
-        report_norm = normalize_name(report_name)
-        if not report_norm:
-            continue
+    # Fuzzy match must be unique; bail out as soon as a second report matches.
+    fuzzy_match: dict[str, Any] | None = None
+    for report_norm, candidates in index.normalized.items():
         if target_norm in report_norm or report_norm in target_norm:
-            fuzzy_matches.append(report)
+            if fuzzy_match is not None or len(candidates) > 1:
+                return None
+            fuzzy_match = candidates[0]
 
-    if len(fuzzy_matches) == 1:
-        return fuzzy_matches[0]
-    return None
+    return fuzzy_match
 
 
 def format_duration(seconds: float) -> str:
@@ -449,10 +618,12 @@ def build_summary(
     available_report_names: list[str],
     website_name: str,
 ) -> dict[str, Any]:
-    visitors = int(metric_value(basic_stats, "visitors"))
-    visits = int(metric_value(basic_stats, "visits"))
     # Umami stats.totaltime is reported in seconds (not milliseconds).
-    total_time_seconds = float(metric_value(basic_stats, "totaltime"))
+    raw_visitors, raw_visits, total_time_seconds = metric_values(
+        basic_stats, "visitors", "visits", "totaltime"
+    )
+    visitors = int(raw_visitors)
+    visits = int(raw_visits)
     avg_visit_duration_seconds = (total_time_seconds / visits) if visits else 0.0
 
     return {
@@ -503,7 +674,7 @@ def render_markdown(summary: dict[str, Any]) -> str:
         return "\n".join(lines)
 
     for item in funnels:
-        display_name = item.get("display_name", item.get("requested_name", "unknown"))
+        display_name = item.get("display_name") or item.get("requested_name") or "unknown"
         status = item.get("status")
 
         if status != "ok":
@@ -530,7 +701,7 @@ def push_to_feishu(webhook_url: str, text: str, timeout: float) -> None:
     }
     req = urllib.request.Request(
         url=webhook_url,
-        data=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+        data=dump_json(payload),
         method="POST",
         headers={
             "Accept": "application/json",
@@ -542,7 +713,7 @@ def push_to_feishu(webhook_url: str, text: str, timeout: float) -> None:
 
     try:
         with urllib.request.urlopen(req, timeout=timeout) as resp:
-            raw = resp.read().decode("utf-8", errors="replace")
+            raw = resp.read()
     except urllib.error.HTTPError as exc:
         err_body = exc.read().decode("utf-8", errors="replace")
         raise UmamiApiError(
@@ -555,8 +726,8 @@ def push_to_feishu(webhook_url: str, text: str, timeout: float) -> None:
         return
 
     try:
-        data = json.loads(raw)
-    except json.JSONDecodeError:
+        data = load_json(raw)
+    except ValueError:
         return
 
     if not isinstance(data, dict):
@@ -578,12 +749,15 @@ def run_funnels(
 ) -> tuple[list[dict[str, Any]], list[str]]:
     reports = client.get_funnel_reports(website_id)
     available_names = [str(report.get("name", "")) for report in reports if report.get("name")]
+    report_index = index_reports(reports)
 
     results: list[dict[str, Any]] = []
+    # (result index, matched report fields, steps, window) for each funnel to run.
+    tasks: list[tuple[int, dict[str, Any], list[Any], int]] = []
     for requested_name in target_names:
         display_name = DEFAULT_FUNNEL_DISPLAY_NAMES.get(requested_name, requested_name)
         lookup_name = report_map.get(requested_name, requested_name)
-        report = pick_report(lookup_name, reports)
+        report = pick_report(lookup_name, report_index)
         if not report:
             results.append(
                 {
@@ -596,8 +770,13 @@ def run_funnels(
             )
             continue
 
-        report_name = str(report.get("name", ""))
-        report_id = str(report.get("reportId", ""))
+        matched = {
+            "requested_name": requested_name,
+            "display_name": display_name,
+            "lookup_name": lookup_name,
+            "matched_report_name": str(report.get("name", "")),
+            "report_id": str(report.get("reportId", "")),
+        }
         parameters = report.get("parameters") or {}
         steps = parameters.get("steps")
         window = parameters.get("window")
@@ -605,11 +784,7 @@ def run_funnels(
         if not isinstance(steps, list) or not steps:
             results.append(
                 {
-                    "requested_name": requested_name,
-                    "display_name": display_name,
-                    "lookup_name": lookup_name,
-                    "matched_report_name": report_name,
-                    "report_id": report_id,
+                    **matched,
                     "status": "invalid_report",
                     "note": "Report parameters.steps is missing or invalid.",
                 }
@@ -619,64 +794,71 @@ def run_funnels(
         if not isinstance(window, int) or window <= 0:
             window = 60
 
-        try:
-            raw_steps = client.run_funnel(
-                website_id=website_id,
-                range_info=range_info,
-                steps=steps,
-                window_minutes=window,
+        tasks.append((len(results), matched, steps, window))
+        results.append(matched)
+
+    if not tasks:
+        return results, available_names
+
+    # Funnel runs are independent round-trips, so issue them concurrently.
+    with ThreadPoolExecutor(max_workers=min(MAX_FUNNEL_WORKERS, len(tasks))) as executor:
+        futures = [
+            (
+                index,
+                matched,
+                executor.submit(
+                    client.run_funnel,
+                    website_id=website_id,
+                    range_info=range_info,
+                    steps=steps,
+                    window_minutes=window,
+                ),
             )
-        except UmamiApiError as exc:
-            results.append(
-                {
-                    "requested_name": requested_name,
-                    "display_name": display_name,
-                    "lookup_name": lookup_name,
-                    "matched_report_name": report_name,
-                    "report_id": report_id,
+            for index, matched, steps, window in tasks
+        ]
+
+        for index, matched, future in futures:
+            try:
+                raw_steps = future.result()
+            except UmamiApiError as exc:
+                results[index] = {
+                    **matched,
                     "status": "request_failed",
                     "note": str(exc),
                 }
-            )
-            continue
+                continue
+
+            parsed_steps: list[FunnelStep] = []
+            prev_visitors: int | None = None
+            for step_index, row in enumerate(raw_steps, start=1):
+                step_visitors = int(row.get("visitors") or 0)
+                parsed_steps.append(
+                    FunnelStep(
+                        step_index=step_index,
+                        step_type=row.get("type"),
+                        step_value=row.get("value"),
+                        step_label=f"step_{step_index}",
+                        visitors=step_visitors,
+                        dropoff=int(row.get("dropoff") or 0),
+                        rate_from_previous=(
+                            step_visitors / prev_visitors if prev_visitors else None
+                        ),
+                    )
+                )
+                prev_visitors = step_visitors
 
-        parsed_steps: list[dict[str, Any]] = []
-        prev_visitors: int | None = None
-        for index, row in enumerate(raw_steps, start=1):
-            step_visitors = int(row.get("visitors") or 0)
-            step_item = {
-                "step_index": index,
-                "step_type": row.get("type"),
-                "step_value": row.get("value"),
-                "step_label": f"step_{index}",
-                "visitors": step_visitors,
-                "dropoff": int(row.get("dropoff") or 0),
-            }
-            if prev_visitors is None or prev_visitors == 0:
-                step_item["rate_from_previous"] = None
-            else:
-                step_item["rate_from_previous"] = step_visitors / prev_visitors
-            parsed_steps.append(step_item)
-            prev_visitors = step_visitors
-
-        start_visitors = parsed_steps[0]["visitors"] if parsed_steps else 0
-        final_visitors = parsed_steps[-1]["visitors"] if parsed_steps else 0
-        conversion_rate = None if start_visitors == 0 else (final_visitors / start_visitors)
-
-        results.append(
-            {
-                "requested_name": requested_name,
-                "display_name": display_name,
-                "lookup_name": lookup_name,
-                "matched_report_name": report_name,
-                "report_id": report_id,
+            start_visitors = parsed_steps[0].visitors if parsed_steps else 0
+            final_visitors = parsed_steps[-1].visitors if parsed_steps else 0
+            conversion_rate = None if start_visitors == 0 else (final_visitors / start_visitors)
+
+            results[index] = {
+                **matched,
                 "status": "ok",
                 "start_visitors": start_visitors,
                 "final_visitors": final_visitors,
                 "conversion_rate": conversion_rate,
                 "steps": parsed_steps,
             }
-        )
 
     return results, available_names
 
@@ -797,19 +979,24 @@ def main() -> int:
             website_name=website_name,
         )
 
+        markdown = render_markdown(summary)
         if args.format == "json":
-            rendered = json.dumps(summary, ensure_ascii=False, indent=2)
-        else:
-            rendered = render_markdown(summary)
-
-        if args.output:
+            # dump_json already returns UTF-8 bytes; write them without a decode/encode trip.
+            rendered = dump_json(summary, indent=True) + b"\n"
+            if args.output:
+                with open(args.output, "wb") as fp:
+                    fp.write(rendered)
+            else:
+                sys.stdout.flush()
+                sys.stdout.buffer.write(rendered)
+                sys.stdout.buffer.flush()
+        elif args.output:
             with open(args.output, "w", encoding="utf-8") as fp:
-                fp.write(rendered + "\n")
+                fp.write(markdown + "\n")
         else:
-            print(rendered)
+            print(markdown)
 
-        push_body = rendered if args.format == "markdown" else render_markdown(summary)
-        push_to_feishu(webhook_url, push_body, timeout=args.timeout)
+        push_to_feishu(webhook_url, markdown, timeout=args.timeout)
         print("Pushed summary to Feishu webhook.", file=sys.stderr)
         return 0
     except (UmamiApiError, ValueError) as exc: